@@ -1,30 +1,56 @@
 import os
+import io
 import re
 import time
 import threading
-import feedparser
 from dotenv import load_dotenv
 import telebot
 import logging
+import atexit
+import signal
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 from datetime import datetime
+from telebot import apihelper
 from telebot.types import ReplyKeyboardMarkup, KeyboardButton, BotCommand
 import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from typing import Any, Union, List, Optional, Type, Callable
+import html
+import xml.etree.ElementTree as ElementTree
+from types import SimpleNamespace
+from typing import Any, Union, List, Dict, Tuple, Optional, Type, Callable
 from PIL import Image, ImageDraw, ImageFont
 import textwrap
 import random
 import traceback
+import sqlite3
+import hashlib
+import tempfile
+from functools import lru_cache
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Настройка логирования: запись в файл и консоль выполняется в фоновом
+# потоке, рабочие потоки бота только кладут записи в очередь
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [
+    logging.FileHandler("rss_bot.log"),
+    logging.StreamHandler()
+]
+for log_handler in log_handlers:
+    log_handler.setFormatter(log_formatter)
+
+log_queue: SimpleQueue = SimpleQueue()
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(QueueHandler(log_queue))
+log_listener = QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("rss_bot.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger('RSSBot')
 
 # Загрузка переменных окружения
@@ -70,7 +96,17 @@ RSS_URLS: List[str] = get_env_var(
     default="https://www.interfax.ru/rss.asp", 
     var_type=list
 )
+# Повторы адресов убираются с сохранением порядка, каждая лента
+# загружается и разбирается один раз
+RSS_URLS = list(dict.fromkeys(RSS_URLS))
 CHECK_INTERVAL: int = get_env_var('CHECK_INTERVAL', default=300, var_type=int)
+POLL_TIMEOUT: int = get_env_var('POLL_TIMEOUT', default=50, var_type=int)
+BOT_THREADS: int = get_env_var('BOT_THREADS', default=8, var_type=int)
+CHANNEL_POSTS_PER_MINUTE: int = get_env_var('CHANNEL_POSTS_PER_MINUTE', default=20, var_type=int)
+FEED_WORKERS: int = get_env_var('FEED_WORKERS', default=8, var_type=int)
+FEED_CHECK_TIMEOUT: int = get_env_var('FEED_CHECK_TIMEOUT', default=5, var_type=int)
+FEED_CHECK_TTL: int = get_env_var('FEED_CHECK_TTL', default=3600, var_type=int)
+FEED_CHECK_STATE_PATH: str = get_env_var('FEED_CHECK_STATE_PATH', default='.rss_check.json')
 
 # YandexGPT settings
 YANDEX_API_KEY: Optional[str] = get_env_var('YANDEX_API_KEY')
@@ -82,58 +118,378 @@ FONTS_DIR: str = get_env_var('FONTS_DIR', default='fonts')
 TEMPLATES_DIR: str = get_env_var('TEMPLATES_DIR', default='templates')
 OUTPUT_DIR: str = get_env_var('OUTPUT_DIR', default='temp_images')
 DEFAULT_FONT: str = get_env_var('DEFAULT_FONT', default='Montserrat-Bold.ttf')
+MAIN_FONT_PATH: str = os.path.join(FONTS_DIR, DEFAULT_FONT)
+IMAGE_CACHE_SIZE: int = get_env_var('IMAGE_CACHE_SIZE', default=100, var_type=int)
+RENDER_WORKERS: int = get_env_var('RENDER_WORKERS', default=2, var_type=int)
 
-bot = telebot.TeleBot(TOKEN)
-sent_entries = set()
-
-# Статистика работы бота
-stats = {
-    'start_time': None,
-    'posts_sent': 0,
-    'last_check': None,
-    'errors': 0,
-    'last_post': None,
-    'yagpt_used': 0,
-    'yagpt_errors': 0,
-    'images_generated': 0
-}
+# Хранилище отправленных записей
+SENT_DB_PATH: str = get_env_var('SENT_DB_PATH', default='sent_entries.db')
+SENT_CACHE_SIZE: int = get_env_var('SENT_CACHE_SIZE', default=10000, var_type=int)
+SENT_RETENTION_DAYS: int = get_env_var('SENT_RETENTION_DAYS', default=30, var_type=int)
+DEDUP_TITLE_HOURS: int = get_env_var('DEDUP_TITLE_HOURS', default=6, var_type=int)
+
+# Общая keep-alive сессия для Telegram API: соединения с api.telegram.org
+# переиспользуются всеми потоками и не пересоздаются по таймеру. В пуле
+# место для обработчиков команд, потока опроса и RSS-цикла
+telegram_session = requests.Session()
+telegram_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=BOT_THREADS + 2))
+apihelper.session = telegram_session
+apihelper.SESSION_TIME_TO_LIVE = None
+
+# Сессия для запросов к RSS-лентам и YandexGPT: keep-alive соединения и
+# повтор каждого запроса с задержкой при сетевых сбоях и ошибках сервера.
+# На хост приходится не больше потоков загрузки лент и пула подготовки постов
+http_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=max(FEED_WORKERS, 1) + max(RENDER_WORKERS, 1),
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=frozenset(['GET', 'POST'])
+    )
+)
+# Запрос к YandexGPT платный и долгий: после таймаута чтения ответ мог быть
+# уже сгенерирован, поэтому повторяются только ошибки соединения и 5xx
+yagpt_adapter = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=max(RENDER_WORKERS, 1),
+    max_retries=Retry(
+        total=3,
+        read=0,
+        backoff_factor=0.5,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=frozenset(['POST'])
+    )
+)
+http_session = requests.Session()
+http_session.mount('https://', http_adapter)
+http_session.mount('http://', http_adapter)
+http_session.mount('https://llm.api.cloud.yandex.net', yagpt_adapter)
+
+# Ошибка в обработчике логируется и не прерывает опрос и остальные потоки.
+# Сетевые ошибки и ошибки API не считаются обработанными, чтобы telebot
+# повторял getUpdates со своей нарастающей задержкой
+class BotExceptionHandler(telebot.ExceptionHandler):
+    def handle(self, exception: Exception) -> bool:
+        if isinstance(exception, (apihelper.ApiException, requests.exceptions.RequestException)):
+            return False
+        logger.error("Handler error: %s", exception, exc_info=exception)
+        return True
+
+# Команды обрабатываются пулом потоков, чтобы долгий обработчик
+# не задерживал следующий getUpdates
+bot = telebot.TeleBot(
+    TOKEN,
+    threaded=True,
+    num_threads=BOT_THREADS,
+    exception_handler=BotExceptionHandler()
+)
+
+# Учёт отправленных ссылок: ограниченный LRU в памяти поверх таблицы SQLite,
+# чтобы после перезапуска бот не публиковал старые записи повторно
+class SentEntriesStore:
+    def __init__(self, db_path: str, max_size: int, retention_days: int, title_hours: int):
+        self.max_size = max_size
+        self.retention = retention_days * 86400
+        self.title_window = title_hours * 3600
+        self.lock = threading.Lock()
+        self.links: OrderedDict = OrderedDict()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (link TEXT PRIMARY KEY, ts INTEGER)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seen_ts ON seen (ts)")
+        # Ключи дедупликации опубликованных новостей: нормализованный адрес
+        # хранится весь срок, хэш заголовка - только DEDUP_TITLE_HOURS, чтобы
+        # повторяющиеся заголовки ("Погода на завтра") не скрывали новые новости
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen_keys (key TEXT PRIMARY KEY, ts INTEGER)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seen_keys_ts ON seen_keys (ts)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen_titles (key TEXT PRIMARY KEY, ts INTEGER)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seen_titles_ts ON seen_titles (ts)")
+        self.purge()
+        
+        # Прогреваем память последними отправленными ссылками
+        rows = self.conn.execute(
+            "SELECT link, ts FROM seen ORDER BY ts DESC LIMIT ?", (max_size,)
+        ).fetchall()
+        for link, ts in reversed(rows):
+            self.links[link] = ts
+    
+    def __contains__(self, link: str) -> bool:
+        with self.lock:
+            ts = self.links.get(link)
+            if ts is None:
+                # Ссылка могла быть вытеснена из памяти, но остаться в базе
+                row = self.conn.execute("SELECT ts FROM seen WHERE link = ?", (link,)).fetchone()
+                if not row:
+                    return False
+                ts = row[0]
+            
+            # Срок хранения отсчитывается от последнего появления в ленте,
+            # иначе purge удалит ссылку, которая ещё есть в медленной ленте.
+            # Отметка обновляется в базе не чаще раза в сутки
+            now = int(time.time())
+            if now - ts >= 86400:
+                self.conn.execute("UPDATE seen SET ts = ? WHERE link = ?", (now, link))
+                self.conn.commit()
+                ts = now
+            self._remember(link, ts)
+            return True
+    
+    def is_duplicate(self, link_key: str, title_key: str) -> bool:
+        """Проверяет, публиковалась ли та же новость: по адресу за весь срок
+        хранения, по заголовку - за последние DEDUP_TITLE_HOURS"""
+        with self.lock:
+            if self.conn.execute("SELECT 1 FROM seen_keys WHERE key = ?", (link_key,)).fetchone():
+                return True
+            if title_key and self.conn.execute(
+                "SELECT 1 FROM seen_titles WHERE key = ? AND ts >= ?",
+                (title_key, int(time.time()) - self.title_window)
+            ).fetchone():
+                return True
+            return False
+    
+    def add(self, link: str, keys: Optional[Tuple[str, str]] = None) -> None:
+        now = int(time.time())
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO seen (link, ts) VALUES (?, ?)",
+                (link, now)
+            )
+            if keys:
+                link_key, title_key = keys
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO seen_keys (key, ts) VALUES (?, ?)",
+                    (link_key, now)
+                )
+                if title_key:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO seen_titles (key, ts) VALUES (?, ?)",
+                        (title_key, now)
+                    )
+            self.conn.commit()
+            self._remember(link, now)
+    
+    def purge(self) -> None:
+        """Удаляет из базы ссылки старше срока хранения"""
+        with self.lock:
+            cutoff = int(time.time()) - self.retention
+            self.conn.execute("DELETE FROM seen WHERE ts < ?", (cutoff,))
+            self.conn.execute("DELETE FROM seen_keys WHERE ts < ?", (cutoff,))
+            self.conn.execute(
+                "DELETE FROM seen_titles WHERE ts < ?",
+                (int(time.time()) - self.title_window,)
+            )
+            self.conn.commit()
+    
+    def _remember(self, link: str, ts: int) -> None:
+        self.links[link] = ts
+        self.links.move_to_end(link)
+        if len(self.links) > self.max_size:
+            self.links.popitem(last=False)
+
+sent_entries = SentEntriesStore(SENT_DB_PATH, SENT_CACHE_SIZE, SENT_RETENTION_DAYS, DEDUP_TITLE_HOURS)
+
+# Регулярное выражение для очистки HTML-тегов. Тег не может содержать '<',
+# поэтому каждая попытка совпадения заканчивается на следующей скобке и
+# разбор идёт за линейное время даже на строках из незакрытых '<'
+HTML_TAG_RE = re.compile(r'<[^<>]+>')
+
+def parse_feed(content: bytes, headers: Optional[dict] = None) -> List[Any]:
+    """Разбирает ленту: RSS 2.0 читается C-парсером ElementTree, Atom и
+    нестандартные ленты передаются feedparser"""
+    try:
+        root = ElementTree.fromstring(content)
+    except ElementTree.ParseError:
+        root = None
+        
+    if root is None or root.tag != 'rss':
+        # feedparser тяжёлый и нужен не каждой ленте, импортируется при первом вызове
+        import feedparser
+        return feedparser.parse(content, response_headers=headers).entries
+    
+    entries = []
+    for item in root.iter('item'):
+        fields = {}
+        for name in ('title', 'link', 'description'):
+            value = item.findtext(name)
+            if value is not None:
+                fields[name] = value.strip() if name == 'link' else value
+        entries.append(SimpleNamespace(**fields))
+    return entries
+
+def entry_dedup_keys(entry: Any) -> Tuple[str, str]:
+    """Ключи для поиска одной и той же новости в разных лентах: адрес без
+    схемы, www и utm-меток и хэш нормализованного заголовка"""
+    parts = urlsplit(entry.link.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = '&'.join(
+        param for param in parts.query.split('&')
+        if param and not param.startswith('utm_')
+    )
+    link_key = f"{host}{parts.path.rstrip('/')}?{query}"
+    
+    title = HTML_TAG_RE.sub('', getattr(entry, 'title', '') or '')
+    title = ' '.join(title.lower().split())
+    title_key = hashlib.sha1(title.encode('utf-8')).hexdigest() if title else ''
+    return link_key, title_key
+
+# Статистика работы бота. Счётчики меняются из RSS-цикла, пула подготовки
+# постов и обработчиков команд, поэтому изменения идут под блокировкой,
+# а отчёты строятся по согласованному снимку
+class BotStats:
+    COUNTERS = ('posts_sent', 'errors', 'yagpt_used', 'yagpt_errors', 'images_generated')
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Counter = Counter()
+        self.values: Dict[str, Any] = {
+            'start_time': None,
+            'last_check': None,
+            'last_post': None
+        }
+    
+    def inc(self, key: str, n: int = 1) -> None:
+        with self.lock:
+            self.counters[key] += n
+    
+    def set(self, key: str, value: Any) -> None:
+        with self.lock:
+            self.values[key] = value
+    
+    def reset(self) -> None:
+        """Сбрасывает счётчики при запуске публикации"""
+        with self.lock:
+            self.counters.clear()
+            self.values['start_time'] = datetime.now()
+            self.values['last_check'] = None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            data = dict(self.values)
+            for key in self.COUNTERS:
+                data[key] = self.counters[key]
+        return data
+
+stats = BotStats()
+
+# Размер фона, если шаблонов нет
+DEFAULT_BACKGROUND_SIZE = (1200, 630)
+
+# Шрифт загружается FreeType один раз для каждого размера
+@lru_cache(maxsize=32)
+def load_font(font_path: str, size: int) -> Optional[ImageFont.FreeTypeFont]:
+    try:
+        return ImageFont.truetype(font_path, size)
+    except IOError:
+        return None
+
+# Декодированные шаблоны держим в памяти, чтобы не распаковывать JPEG/PNG
+# на каждый пост
+@lru_cache(maxsize=32)
+def load_template(template_path: str) -> Image.Image:
+    with Image.open(template_path) as template:
+        return template.convert('RGB')
 
 # Класс для генерации изображений с заголовками
 class ImageGenerator:
     def __init__(self, templates_dir: str, fonts_dir: str, output_dir: str):
         self.templates_dir = templates_dir
         self.fonts_dir = fonts_dir
+        self.font_path = os.path.join(fonts_dir, DEFAULT_FONT)
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
         os.makedirs(self.templates_dir, exist_ok=True)
         os.makedirs(self.fonts_dir, exist_ok=True)
+        self.templates: List[str] = []
+        self.templates_mtime: Optional[float] = None
+        self.refresh_templates()
+    
+    def refresh_templates(self) -> None:
+        """Перечитывает список шаблонов из каталога"""
+        load_template.cache_clear()
+        try:
+            self.templates_mtime = os.stat(self.templates_dir).st_mtime
+            self.templates = [f for f in os.listdir(self.templates_dir)
+                              if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+        except OSError as e:
+            logger.error(f"Templates listing failed: {str(e)}")
+            self.templates_mtime = None
+            self.templates = []
+        self.preload_fonts()
+    
+    @staticmethod
+    def font_size(size: Tuple[int, int]) -> int:
+        """Размер шрифта в зависимости от размера изображения"""
+        return max(10, min(size) // 15)
+    
+    def preload_fonts(self) -> None:
+        """Загружает шрифт заранее во всех размерах, которые дадут шаблоны"""
+        sizes = set()
+        for template_file in self.templates:
+            try:
+                # Image.open читает только заголовок файла
+                with Image.open(os.path.join(self.templates_dir, template_file)) as template:
+                    sizes.add(self.font_size(template.size))
+            except OSError as e:
+                logger.warning(f"Template {template_file} is unreadable: {str(e)}")
+        if not self.templates:
+            sizes.add(self.font_size(DEFAULT_BACKGROUND_SIZE))
+            
+        for size in sizes:
+            load_font(self.font_path, size)
         
-    def generate_image(self, title: str) -> Optional[str]:
-        """Генерирует изображение с заголовком новости"""
+    def generate_image(self, title: str, use_cache: bool = True) -> Optional[io.BytesIO]:
+        """Генерирует JPEG с заголовком новости в памяти. С use_cache=False
+        дисковый кэш не читается и не пополняется"""
         try:
-            # Получаем список доступных шаблонов
-            templates = [f for f in os.listdir(self.templates_dir) 
-                        if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+            # Список шаблонов перечитывается, только если каталог изменился
+            if os.stat(self.templates_dir).st_mtime != self.templates_mtime:
+                self.refresh_templates()
+            templates = self.templates
             
+            template_file = ""
+            template = None
             if not templates:
                 logger.warning("No templates found. Using default background")
-                # Создаем простой фон, если шаблонов нет
-                img = Image.new('RGB', (1200, 630), color=(40, 40, 40))
+                size = DEFAULT_BACKGROUND_SIZE
             else:
                 # Выбираем случайный шаблон
                 template_file = random.choice(templates)
                 template_path = os.path.join(self.templates_dir, template_file)
-                img = Image.open(template_path).convert('RGB')
+                template = load_template(template_path)
+                size = template.size
+            
+            base_font_size = self.font_size(size)
+            
+            # Готовое изображение с тем же заголовком, шаблоном и размером шрифта
+            # берём из дискового кэша без повторной отрисовки
+            cache_key = hashlib.sha1(
+                f"{title}|{template_file}|{base_font_size}".encode('utf-8')
+            ).hexdigest()
+            cache_path = os.path.join(self.output_dir, f"{cache_key}.jpg")
+            use_cache = use_cache and IMAGE_CACHE_SIZE > 0
+            if use_cache and os.path.exists(cache_path):
+                with open(cache_path, 'rb') as cached:
+                    buffer = io.BytesIO(cached.read())
+                os.utime(cache_path)
+                buffer.name = 'post.jpg'
+                logger.info(f"Image cache hit: {cache_path}")
+                return buffer
+            
+            if template:
+                # Рисуем на копии, декодированный шаблон остаётся в кэше
+                img = template.copy()
+            else:
+                # Создаем простой фон, если шаблонов нет
+                img = Image.new('RGB', size, color=(40, 40, 40))
             
             draw = ImageDraw.Draw(img)
             
             # Загружаем шрифт
-            font_path = os.path.join(self.fonts_dir, DEFAULT_FONT)
-            try:
-                # Определяем размер шрифта в зависимости от размера изображения
-                base_font_size = max(10, min(img.width, img.height) // 15)
-                font = ImageFont.truetype(font_path, base_font_size)
-            except IOError:
+            font = load_font(self.font_path, base_font_size)
+            if font is None:
                 logger.warning(f"Font {DEFAULT_FONT} not found. Using default font")
                 font = ImageFont.load_default()
                 base_font_size = 20
@@ -145,25 +501,27 @@ class ImageGenerator:
             max_width = img.width - 100   # Отступы по бокам
             max_lines = 3                 # Максимум строк
             
-            # Разбиваем заголовок на строки
+            # Разбиваем заголовок на строки: ширина каждого слова измеряется
+            # один раз, длина строки набирается суммой ширин
             lines = []
             words = title.split()
-            current_line = ""
+            space_width = draw.textlength(" ", font=font)
+            word_widths = [draw.textlength(word, font=font) for word in words]
+            current_words: List[str] = []
+            current_width = 0.0
             
-            for word in words:
-                test_line = current_line + word + " "
-                # Оцениваем ширину текста через bbox
-                text_bbox = draw.textbbox((0, 0), test_line, font=font)
-                text_width = text_bbox[2] - text_bbox[0]
-                if text_width <= max_width:
-                    current_line = test_line
+            for word, word_width in zip(words, word_widths):
+                line_width = current_width + word_width + space_width
+                if current_words and line_width > max_width:
+                    lines.append(" ".join(current_words))
+                    current_words = [word]
+                    current_width = word_width + space_width
                 else:
-                    if current_line:
-                        lines.append(current_line.strip())
-                    current_line = word + " "
+                    current_words.append(word)
+                    current_width = line_width
             
-            if current_line:
-                lines.append(current_line.strip())
+            if current_words:
+                lines.append(" ".join(current_words))
             
             # Ограничиваем количество строк
             if len(lines) > max_lines:
@@ -171,7 +529,7 @@ class ImageGenerator:
                 if len(lines[-1]) > 15:
                     lines[-1] = lines[-1][:-3] + "..."
             
-            # Рассчитываем высоту строки
+            # Рассчитываем высоту строки (единственный замер через bbox)
             test_bbox = draw.textbbox((0, 0), "Test", font=font)
             line_height = int((test_bbox[3] - test_bbox[1]) * 1.2)
             total_height = len(lines) * line_height
@@ -181,10 +539,9 @@ class ImageGenerator:
             
             # Рисуем каждую строку текста
             for line in lines:
-                # Рассчитываем ширину текста для центрирования
-                text_bbox = draw.textbbox((0, 0), line, font=font)
-                text_width = text_bbox[2] - text_bbox[0]
-                x_position = (img.width - text_width) // 2
+                # Ширина строки для центрирования (без растеризации контуров)
+                text_width = draw.textlength(line, font=font)
+                x_position = int(img.width - text_width) // 2
                 
                 # Рисуем текст с контуром для лучшей читаемости
                 draw.text(
@@ -197,18 +554,54 @@ class ImageGenerator:
                 )
                 y_position += line_height
             
-            # Сохраняем изображение
-            os.makedirs(self.output_dir, exist_ok=True)
-            output_path = os.path.join(self.output_dir, f"post_{int(time.time())}.jpg")
-            img.save(output_path)
+            # Кодируем изображение в память; имя нужно для загрузки в Telegram
+            buffer = io.BytesIO()
+            img.save(
+                buffer,
+                'JPEG',
+                quality=80,
+                subsampling=2,
+                optimize=False,
+                progressive=False
+            )
+            buffer.name = 'post.jpg'
+            
+            # Копия в дисковом кэше, если он включен
+            if use_cache:
+                os.makedirs(self.output_dir, exist_ok=True)
+                # Пишем во временный файл и атомарно переименовываем, чтобы
+                # сбой или параллельный рендер не оставили в кэше обрезанный JPEG
+                fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as cached:
+                        cached.write(buffer.getvalue())
+                    os.replace(tmp_path, cache_path)
+                except OSError:
+                    os.unlink(tmp_path)
+                    raise
+                self.prune_cache()
             
-            stats['images_generated'] += 1
-            return output_path
+            buffer.seek(0)
+            stats.inc('images_generated')
+            return buffer
         
         except Exception as e:
             logger.error(f"Image generation failed: {str(e)}")
             logger.error(traceback.format_exc())
             return None
+    
+    def prune_cache(self) -> None:
+        """Оставляет в кэше только IMAGE_CACHE_SIZE последних изображений"""
+        with os.scandir(self.output_dir) as it:
+            files = [e for e in it if e.is_file() and e.name.endswith('.jpg')]
+        if len(files) <= IMAGE_CACHE_SIZE:
+            return
+        files.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for entry in files[IMAGE_CACHE_SIZE:]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
 
 # Инициализация генератора изображений
 image_generator = ImageGenerator(
@@ -217,6 +610,10 @@ image_generator = ImageGenerator(
     output_dir=OUTPUT_DIR
 )
 
+# Пул подготовки постов: рендер и кодирование изображений в Pillow, а также
+# запросы к YandexGPT выполняются вне потока отправки
+render_pool = ThreadPoolExecutor(max_workers=max(RENDER_WORKERS, 1), thread_name_prefix='render')
+
 def enhance_with_yagpt(title: str, description: str) -> Optional[dict]:
     """Улучшает текст поста с помощью YandexGPT через REST API"""
     if DISABLE_YAGPT or not YANDEX_API_KEY or not YANDEX_FOLDER_ID:
@@ -266,7 +663,7 @@ def enhance_with_yagpt(title: str, description: str) -> Optional[dict]:
             ]
         }
 
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+        response = http_session.post(url, headers=headers, json=data, timeout=30)
         response.raise_for_status()
         result = response.json()
 
@@ -293,10 +690,10 @@ def enhance_with_yagpt(title: str, description: str) -> Optional[dict]:
 
     except requests.exceptions.RequestException as e:
         logger.error(f"YandexGPT request error: {str(e)}")
-        stats['yagpt_errors'] += 1
+        stats.inc('yagpt_errors')
     except Exception as e:
         logger.error(f"YandexGPT processing error: {str(e)}")
-        stats['yagpt_errors'] += 1
+        stats.inc('yagpt_errors')
     
     return None
 
@@ -306,29 +703,47 @@ class BotController:
         self.is_running = False
         self.worker_thread: Optional[threading.Thread] = None
         self.stop_event = threading.Event()
+        # Команды обрабатываются несколькими потоками, поэтому запуск и
+        # остановка выполняются под блокировкой
+        self.lock = threading.Lock()
         self.last_check = datetime.now()
+        # ETag/Last-Modified каждой ленты для условных запросов
+        self.feed_validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
         
     def start(self) -> bool:
+        with self.lock:
+            return self._start()
+        
+    def stop(self) -> bool:
+        with self.lock:
+            return self._stop()
+        
+    def restart(self) -> bool:
+        """Останавливает и сразу запускает публикацию одной операцией"""
+        with self.lock:
+            self._stop()
+            return self._start()
+        
+    def _start(self) -> bool:
         if self.is_running:
             return False
             
+        # У каждого запуска своё событие остановки: поток прошлого запуска,
+        # не успевший завершиться за время ожидания в stop(), видит своё
+        # событие установленным и выходит, а не продолжает вместе с новым
         self.is_running = True
-        self.stop_event.clear()
-        self.worker_thread = threading.Thread(target=self.rss_loop, daemon=True)
+        self.stop_event = threading.Event()
+        self.worker_thread = threading.Thread(
+            target=self.rss_loop, args=(self.stop_event,), daemon=True
+        )
         self.worker_thread.start()
         
         # Запись статистики
-        stats['start_time'] = datetime.now()
-        stats['last_check'] = None
-        stats['posts_sent'] = 0
-        stats['errors'] = 0
-        stats['yagpt_used'] = 0
-        stats['yagpt_errors'] = 0
-        stats['images_generated'] = 0
+        stats.reset()
         
         return True
         
-    def stop(self) -> bool:
+    def _stop(self) -> bool:
         if not self.is_running:
             return False
             
@@ -344,100 +759,234 @@ class BotController:
     def status(self) -> bool:
         return self.is_running
         
-    def rss_loop(self) -> None:
+    def rss_loop(self, stop_event: threading.Event) -> None:
         logger.info("===== RSS LOOP STARTED =====")
-        while self.is_running and not self.stop_event.is_set():
+        while not stop_event.is_set():
             try:
                 self.last_check = datetime.now()
-                stats['last_check'] = self.last_check
+                stats.set('last_check', self.last_check)
+                sent_entries.purge()
                 logger.info(f"Checking {len(RSS_URLS)} RSS feeds")
                 
-                for url in RSS_URLS:
-                    if self.stop_event.is_set():
-                        break
-                        
-                    try:
-                        feed = feedparser.parse(url)
-                        if not feed.entries:
-                            logger.warning(f"Empty feed: {url}")
-                            continue
-                            
-                        # Обработка новых записей
-                        for entry in reversed(feed.entries[:10]):
-                            if self.stop_event.is_set():
-                                break
-                                
-                            if not hasattr(entry, 'link') or entry.link in sent_entries:
-                                continue
-                                
-                            try:
-                                message, image_path = self.format_message(entry)
-                                
-                                # Отправка с изображением, если доступно
-                                if image_path and os.path.exists(image_path):
-                                    try:
-                                        with open(image_path, 'rb') as photo:
-                                            bot.send_photo(
-                                                chat_id=CHANNEL_ID,
-                                                photo=photo,
-                                                caption=message,
-                                                parse_mode='HTML'
-                                            )
-                                        # Удаляем временный файл после отправки
-                                        os.remove(image_path)
-                                        logger.info(f"Image sent and removed: {image_path}")
-                                    except Exception as e:
-                                        logger.error(f"Error sending photo: {str(e)}")
-                                        # Пробуем отправить без изображения
-                                        bot.send_message(
-                                            chat_id=CHANNEL_ID,
-                                            text=message,
-                                            parse_mode='HTML'
-                                        )
-                                else:
-                                    bot.send_message(
-                                        chat_id=CHANNEL_ID,
-                                        text=message,
-                                        parse_mode='HTML'
-                                    )
-                                
-                                sent_entries.add(entry.link)
-                                stats['posts_sent'] += 1
-                                stats['last_post'] = datetime.now()
-                                logger.info(f"Posted: {entry.link}")
-                                
-                                # Пауза между постами
-                                time.sleep(3)
-                                
-                            except Exception as e:
-                                logger.error(f"Send error: {str(e)}")
-                                stats['errors'] += 1
-                                
-                    except Exception as e:
-                        logger.error(f"Feed error ({url}): {str(e)}")
-                        stats['errors'] += 1
-                
-                # Ожидание следующей проверки с возможностью прерывания
-                logger.info(f"Cycle complete. Next check in {CHECK_INTERVAL} sec")
-                self.stop_event.wait(CHECK_INTERVAL)
+                # Ленты загружаются параллельно, затем новые записи всех лент
+                # объединяются без дублей и публикуются одним списком
+                feeds = self.fetch_feeds(stop_event)
+                if not stop_event.is_set():
+                    self.process_feeds(feeds, stop_event)
                 
             except Exception as e:
                 logger.critical(f"Loop error: {str(e)}")
-                stats['errors'] += 1
-                time.sleep(30)
+                stats.inc('errors')
+                
+            # Ожидание следующей проверки с возможностью прерывания
+            logger.info(f"Cycle complete. Next check in {CHECK_INTERVAL} sec")
+            stop_event.wait(CHECK_INTERVAL)
                 
         logger.info("===== RSS LOOP STOPPED =====")
     
+    def fetch_feeds(self, stop_event: threading.Event) -> List[Tuple[str, Dict[str, Any]]]:
+        """Параллельно загружает все ленты в порядке RSS_URLS"""
+        feeds: Dict[str, Dict[str, Any]] = {}
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(FEED_WORKERS, len(RSS_URLS))),
+            thread_name_prefix='feed'
+        )
+        try:
+            futures = {executor.submit(self.fetch_feed, url): url for url in RSS_URLS}
+            for future in as_completed(futures):
+                if stop_event.is_set():
+                    break
+                
+                url = futures[future]
+                try:
+                    feed = future.result()
+                    if feed is not None:
+                        feeds[url] = feed
+                except Exception as e:
+                    logger.error(f"Feed error ({url}): {str(e)}")
+                    stats.inc('errors')
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            
+        return [(url, feeds[url]) for url in RSS_URLS if url in feeds]
+    
+    def fetch_feed(self, url: str) -> Optional[Dict[str, Any]]:
+        """Загружает ленту условным запросом; возвращает None, если она не изменилась"""
+        headers = {}
+        etag, modified = self.feed_validators.get(url, (None, None))
+        if etag:
+            headers['If-None-Match'] = etag
+        if modified:
+            headers['If-Modified-Since'] = modified
+            
+        response = http_session.get(url, headers=headers, timeout=30)
+        if response.status_code == 304:
+            logger.info(f"Feed not modified: {url}")
+            return None
+        response.raise_for_status()
+        
+        return {
+            'entries': parse_feed(response.content, dict(response.headers)),
+            'validators': (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        }
+    
+    def process_feeds(self, feeds: List[Tuple[str, Dict[str, Any]]], stop_event: threading.Event) -> None:
+        """Публикует новые записи всех лент, пропуская повторы одной новости"""
+        candidates = []
+        duplicates: List[Tuple[str, str]] = []
+        feed_links: Dict[str, List[str]] = {}
+        seen_links: Dict[str, str] = {}
+        seen_titles: Dict[str, str] = {}
+        
+        for url, feed in feeds:
+            links: List[str] = []
+            feed_links[url] = links
+            if not feed['entries']:
+                logger.warning(f"Empty feed: {url}")
+                continue
+                
+            # Обработка новых записей
+            for entry in reversed(feed['entries'][:10]):
+                if not hasattr(entry, 'link') or entry.link in sent_entries:
+                    continue
+                
+                # Та же новость уже опубликована из другой ленты в прошлых циклах
+                link_key, title_key = entry_dedup_keys(entry)
+                if sent_entries.is_duplicate(link_key, title_key):
+                    sent_entries.add(entry.link)
+                    logger.info(f"Duplicate skipped: {entry.link}")
+                    continue
+                links.append(entry.link)
+                
+                original = seen_links.get(link_key) or (title_key and seen_titles.get(title_key))
+                if original:
+                    if original != entry.link:
+                        duplicates.append((entry.link, original))
+                    continue
+                    
+                seen_links[link_key] = entry.link
+                if title_key:
+                    seen_titles[title_key] = entry.link
+                candidates.append(entry)
+        
+        self.publish_entries(candidates, stop_event)
+        
+        # Повтор считается отправленным вместе с опубликованной новостью
+        for link, original in duplicates:
+            if original in sent_entries:
+                sent_entries.add(link)
+                logger.info(f"Duplicate skipped: {link}")
+        
+        # Валидаторы сохраняем только после полной обработки ленты,
+        # иначе неотправленные записи потеряются за ответом 304
+        for url, feed in feeds:
+            if all(link in sent_entries for link in feed_links[url]):
+                self.feed_validators[url] = feed['validators']
+    
+    def publish_entries(self, entries: List[Any], stop_event: threading.Event) -> None:
+        """Публикует записи по порядку"""
+        # Подготовка постов (YandexGPT и рендер изображения) идёт в пуле
+        # с опережением на RENDER_WORKERS записей, пока отправляются предыдущие
+        pending: deque = deque()
+        queue = iter(entries)
+        
+        def prepare_next() -> None:
+            entry = next(queue, None)
+            if entry is not None:
+                pending.append((entry, render_pool.submit(self.format_message, entry)))
+        
+        for _ in range(max(RENDER_WORKERS, 1)):
+            prepare_next()
+        
+        while pending:
+            entry, future = pending.popleft()
+            prepare_next()
+            
+            # Ждём разрешения лимитов Telegram; команда остановки прерывает ожидание
+            if (stop_event.is_set()
+                    or not channel_limiter.acquire(stop_event)
+                    or not chat_limiter.acquire(stop_event)
+                    or not bot_limiter.acquire(stop_event)):
+                future.cancel()
+                for _, rest in pending:
+                    rest.cancel()
+                return
+                
+            try:
+                message, image = future.result()
+                
+                # Отправка с изображением, если доступно
+                if image:
+                    try:
+                        sent = self.send_to_channel(
+                            stop_event,
+                            bot.send_photo,
+                            photo=image,
+                            caption=message,
+                            parse_mode='HTML'
+                        )
+                        if sent:
+                            logger.info("Image sent")
+                    except Exception as e:
+                        logger.error(f"Error sending photo: {str(e)}")
+                        # Пробуем отправить без изображения
+                        sent = self.send_to_channel(
+                            stop_event,
+                            bot.send_message,
+                            text=message,
+                            parse_mode='HTML'
+                        )
+                else:
+                    sent = self.send_to_channel(
+                        stop_event,
+                        bot.send_message,
+                        text=message,
+                        parse_mode='HTML'
+                    )
+                
+                # Остановка во время ожидания retry_after: запись не отправлена
+                if not sent:
+                    for _, rest in pending:
+                        rest.cancel()
+                    return
+                
+                sent_entries.add(entry.link, entry_dedup_keys(entry))
+                stats.inc('posts_sent')
+                stats.set('last_post', datetime.now())
+                logger.info(f"Posted: {entry.link}")
+                
+            except Exception as e:
+                logger.error(f"Send error: {str(e)}")
+                stats.inc('errors')
+    
+    def send_to_channel(self, stop_event: threading.Event, method: Callable[..., Any], **kwargs: Any) -> bool:
+        """Отправляет сообщение в канал. При ответе 429 ждёт retry_after и
+        повторяет; возвращает False, если ожидание прервано остановкой"""
+        while True:
+            try:
+                method(chat_id=CHANNEL_ID, **kwargs)
+                return True
+            except apihelper.ApiTelegramException as e:
+                if e.error_code != 429:
+                    raise
+                retry_after = (e.result_json or {}).get('parameters', {}).get('retry_after', 5)
+                logger.warning(f"Flood limit hit, retrying in {retry_after} s")
+                if stop_event.wait(retry_after):
+                    return False
+                # Буфер изображения уже прочитан предыдущей попыткой
+                if 'photo' in kwargs:
+                    kwargs['photo'].seek(0)
+    
     @staticmethod
     def format_message(entry: Any) -> tuple:
         title = entry.title if hasattr(entry, 'title') else "No title"
         description = entry.description if hasattr(entry, 'description') else ""
         link = entry.link if hasattr(entry, 'link') else ""
         
-        # Очистка HTML
-        clean: Callable[[str], str] = lambda text: re.sub(r'<[^>]+>', '', text) if text else ""
-        title = clean(title)
-        description = clean(description)
+        # Очистка HTML: дальше текст обрабатывается без разметки и сущностей
+        # и экранируется только при сборке подписи
+        title = html.unescape(HTML_TAG_RE.sub('', title)) if title else ""
+        description = html.unescape(HTML_TAG_RE.sub('', description)) if description else ""
         
         original_title = title
         original_description = description
@@ -456,45 +1005,79 @@ class BotController:
                         len(new_title) < 120 and len(new_description) < 600):
                         title = new_title
                         description = new_description
-                        stats['yagpt_used'] += 1
+                        stats.inc('yagpt_used')
                         logger.info("YandexGPT enhancement applied")
                     else:
                         logger.warning("YandexGPT output validation failed")
             except Exception as e:
                 logger.error(f"YandexGPT integration error: {str(e)}")
-                stats['yagpt_errors'] += 1
+                stats.inc('yagpt_errors')
 
         # Сокращение описания
         if len(description) > 500:
             description = description[:500] + "..."
             
         # Генерация изображения с заголовком
-        image_path = None
+        image = None
         try:
             # Используем оригинальный или улучшенный заголовок для изображения
             image_title = title if title else original_title
             if image_title:
-                image_path = image_generator.generate_image(image_title)
-                if image_path:
-                    logger.info(f"Image generated: {image_path}")
+                image = image_generator.generate_image(image_title)
+                if image:
+                    logger.info(f"Image generated: {image.getbuffer().nbytes} bytes")
                 else:
-                    logger.warning("Image generation returned no path")
+                    logger.warning("Image generation returned no image")
         except Exception as e:
             logger.error(f"Image generation error: {str(e)}")
         
         # Форматирование сообщения
-        message = f"<b>{title}</b>\n\n{description}\n\n<a href='{link}'>🔗 Читать полностью</a>"
-        return message, image_path
+        message = (
+            f"<b>{html.escape(title, quote=False)}</b>\n\n"
+            f"{html.escape(description, quote=False)}\n\n"
+            f"<a href='{html.escape(link)}'>🔗 Читать полностью</a>"
+        )
+        return message, image
+
+# Ограничитель частоты по алгоритму token bucket: пропускает всплески в
+# пределах ёмкости и ждёт, только когда токены закончились
+class TokenBucket:
+    def __init__(self, capacity: int, period: float):
+        self.capacity = max(capacity, 1)
+        self.rate = self.capacity / period
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, stop_event: threading.Event) -> bool:
+        """Забирает токен; возвращает False, если ожидание прервано остановкой"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                delay = (1 - self.tokens) / self.rate
+            if stop_event.wait(delay):
+                return False
+
+# Лимиты Telegram: публикации в канал в минуту, не больше одного сообщения
+# в секунду в один чат (без всплесков) и 30 сообщений в секунду на бота
+channel_limiter = TokenBucket(CHANNEL_POSTS_PER_MINUTE, 60)
+chat_limiter = TokenBucket(1, 1)
+bot_limiter = TokenBucket(30, 1)
 
 # Инициализация контроллера
 controller = BotController()
 
 # Создаем клавиатуру с кнопками
-def create_reply_keyboard() -> ReplyKeyboardMarkup:
+def build_reply_keyboard(running: bool) -> ReplyKeyboardMarkup:
     markup = ReplyKeyboardMarkup(row_width=2, resize_keyboard=True)
     
     # Первый ряд - управление
-    if controller.status():
+    if running:
         markup.add(
             KeyboardButton("⏸️ Приостановить"),
             KeyboardButton("🛑 Остановить"),
@@ -519,6 +1102,16 @@ def create_reply_keyboard() -> ReplyKeyboardMarkup:
     
     return markup
 
+# Клавиатура зависит только от состояния публикации, поэтому обе версии
+# собираются один раз при запуске
+REPLY_KEYBOARDS: Dict[bool, ReplyKeyboardMarkup] = {
+    running: build_reply_keyboard(running) for running in (True, False)
+}
+
+def create_reply_keyboard() -> ReplyKeyboardMarkup:
+    """Готовая клавиатура для текущего состояния публикации"""
+    return REPLY_KEYBOARDS[controller.status()]
+
 # Регистрируем команды для бокового меню
 bot.set_my_commands([
     BotCommand("start", "Запустить бота"),
@@ -593,25 +1186,29 @@ COMMANDS_LIST = """
 <b>Используйте кнопки внису для быстрого доступа к командам 👇</b>
 """
 
+# Приветственное сообщение собирается один раз при загрузке
+WELCOME_MESSAGE = f"{BOT_DESCRIPTION}\n\n{COMMANDS_LIST}"
+
 # Функции для генерации отчетов
 def generate_status_report() -> str:
     """Генерация отчёта о состоянии бота"""
-    if not stats['start_time']:
+    data = stats.snapshot()
+    if not data['start_time']:
         return "❓ Бот в настоящее время остановлен"
     
-    uptime = datetime.now() - stats['start_time']
+    uptime = datetime.now() - data['start_time']
     hours, remainder = divmod(uptime.total_seconds(), 3600)
     minutes, seconds = divmod(remainder, 60)
     
-    last_check = stats['last_check'].strftime("%H:%M:%S") if stats['last_check'] else "никогда"
-    last_post = stats['last_post'].strftime("%H:%M:%S") if stats['last_post'] else "никогда"
+    last_check = data['last_check'].strftime("%H:%M:%S") if data['last_check'] else "никогда"
+    last_post = data['last_post'].strftime("%H:%M:%S") if data['last_post'] else "никогда"
     
     report = (
         f"🤖 <b>Статус бота</b>\n"
         f"⏱ Время работы: {int(hours)}ч {int(minutes)}м\n"
-        f"📊 Отправлено новостей: {stats['posts_sent']}\n"
-        f"🖼 Сгенерировано изображений: {stats['images_generated']}\n"
-        f"❌ Ошибки: {stats['errors']}\n"
+        f"📊 Отправлено новостей: {data['posts_sent']}\n"
+        f"🖼 Сгенерировано изображений: {data['images_generated']}\n"
+        f"❌ Ошибки: {data['errors']}\n"
         f"🔄 Последняя проверка: {last_check}\n"
         f"📬 Последняя публикация: {last_post}\n"
         f"🔗 Источников: {len(RSS_URLS)}\n"
@@ -621,23 +1218,24 @@ def generate_status_report() -> str:
 
 def generate_stats_report() -> str:
     """Генерация статистического отчёта"""
-    if not stats['start_time']:
+    data = stats.snapshot()
+    if not data['start_time']:
         return "📊 Статистика недоступна: бот не запущен"
     
-    uptime = datetime.now() - stats['start_time']
+    uptime = datetime.now() - data['start_time']
     hours = uptime.total_seconds() / 3600
-    posts_per_hour = stats['posts_sent'] / hours if hours > 0 else 0
+    posts_per_hour = data['posts_sent'] / hours if hours > 0 else 0
     
     report = (
         f"📈 <b>Статистика бота</b>\n"
         f"⏱ Время работы: {str(uptime).split('.')[0]}\n"
-        f"📊 Всего отправлено новостей: {stats['posts_sent']}\n"
-        f"🖼 Сгенерировано изображений: {stats['images_generated']}\n"
+        f"📊 Всего отправлено новостей: {data['posts_sent']}\n"
+        f"🖼 Сгенерировано изображений: {data['images_generated']}\n"
         f"📮 Средняя скорость: {posts_per_hour:.1f} новостей/час\n"
-        f"❌ Всего ошибок: {stats['errors']}\n"
+        f"❌ Всего ошибок: {data['errors']}\n"
         f"🔗 Источников: {len(RSS_URLS)}\n"
-        f"🆔 Канал: {CHANNEL_ID}\n"
-        f"🕒 Последняя активность: {stats['last_check'].strftime('%Y-%m-%d %H:%M') if stats['last_check'] else 'N/A'}"
+        f"🆔 Канал: {CHANNEL_ID}{f' ({html.escape(channel_info.title)})' if channel_info and channel_info.title else ''}\n"
+        f"🕒 Последняя активность: {data['last_check'].strftime('%Y-%m-%d %H:%M') if data['last_check'] else 'N/A'}"
     )
     
     # Добавляем информацию о YandexGPT
@@ -646,8 +1244,8 @@ def generate_stats_report() -> str:
         f"Статус: {'включен ✅' if not DISABLE_YAGPT else 'выключен ⚠️'}\n"
         f"API ключ: {'установлен' if YANDEX_API_KEY else 'отсутствует'}\n"
         f"Каталог: {'указан' if YANDEX_FOLDER_ID else 'не указан'}\n"
-        f"Использовано: {stats['yagpt_used']} раз\n"
-        f"Ошибки: {stats['yagpt_errors']}"
+        f"Использовано: {data['yagpt_used']} раз\n"
+        f"Ошибки: {data['yagpt_errors']}"
     )
     return report
 
@@ -664,6 +1262,7 @@ def list_sources() -> str:
 
 def get_yagpt_status() -> str:
     """Статус интеграции с YandexGPT"""
+    data = stats.snapshot()
     status = "🟢 Активна" if not DISABLE_YAGPT else "🔴 Отключена"
     key_status = "🟢 Установлен" if YANDEX_API_KEY else "🔴 Отсутствует"
     folder_status = "🟢 Указан" if YANDEX_FOLDER_ID else "⚠️ Не указан"
@@ -673,8 +1272,8 @@ def get_yagpt_status() -> str:
         f"• Интеграция: {status}\n"
         f"• API ключ: {key_status}\n"
         f"• Каталог: {folder_status}\n"
-        f"• Использовано: {stats['yagpt_used']} раз\n"
-        f"• Ошибки: {stats['yagpt_errors']}"
+        f"• Использовано: {data['yagpt_used']} раз\n"
+        f"• Ошибки: {data['yagpt_errors']}"
     )
     
     if DISABLE_YAGPT or not YANDEX_API_KEY or not YANDEX_FOLDER_ID:
@@ -690,7 +1289,7 @@ def send_welcome(message: telebot.types.Message) -> None:
         return
         
     bot.reply_to(message, 
-        f"{BOT_DESCRIPTION}\n\n{COMMANDS_LIST}",
+        WELCOME_MESSAGE,
         parse_mode="HTML",
         reply_markup=create_reply_keyboard()
     )
@@ -719,12 +1318,10 @@ def start_command(message: telebot.types.Message) -> None:
         return
         
     if controller.start():
-        bot.reply_to(message, "✅ Публикация начата! 🚀", 
-                    parse_mode="HTML",
+        bot.reply_to(message, "✅ Публикация начата! 🚀",
                     reply_markup=create_reply_keyboard())
     else:
-        bot.reply_to(message, "⚠️ Бот уже запущен!", 
-                    parse_mode="HTML",
+        bot.reply_to(message, "⚠️ Бот уже запущен!",
                     reply_markup=create_reply_keyboard())
 
 @bot.message_handler(commands=['pause', 'stop'])
@@ -733,12 +1330,10 @@ def stop_command(message: telebot.types.Message) -> None:
         return
         
     if controller.stop():
-        bot.reply_to(message, "🛑 Публикация остановлена! ⏸️", 
-                    parse_mode="HTML",
+        bot.reply_to(message, "🛑 Публикация остановлена! ⏸️",
                     reply_markup=create_reply_keyboard())
     else:
-        bot.reply_to(message, "⚠️ Бот уже остановлен!", 
-                    parse_mode="HTML",
+        bot.reply_to(message, "⚠️ Бот уже остановлен!",
                     reply_markup=create_reply_keyboard())
 
 @bot.message_handler(commands=['restart'])
@@ -746,15 +1341,11 @@ def restart_command(message: telebot.types.Message) -> None:
     if message.from_user.id != OWNER_ID: # type: ignore
         return
         
-    controller.stop()
-    time.sleep(1)
-    if controller.start():
-        bot.reply_to(message, "🔄 Бот успешно перезапущен! 🔄", 
-                    parse_mode="HTML",
+    if controller.restart():
+        bot.reply_to(message, "🔄 Бот успешно перезапущен! 🔄",
                     reply_markup=create_reply_keyboard())
     else:
-        bot.reply_to(message, "⚠️ Ошибка при перезапуске!", 
-                    parse_mode="HTML",
+        bot.reply_to(message, "⚠️ Ошибка при перезапуске!",
                     reply_markup=create_reply_keyboard())
 
 @bot.message_handler(commands=['sources'])
@@ -775,6 +1366,33 @@ def yagpt_status_command(message: telebot.types.Message) -> None:
                 parse_mode="HTML",
                 reply_markup=create_reply_keyboard())
 
+def stats_reply(message: telebot.types.Message) -> None:
+    bot.reply_to(message, generate_combined_report(), 
+                parse_mode="HTML",
+                reply_markup=create_reply_keyboard())
+
+def info_reply(message: telebot.types.Message) -> None:
+    bot.reply_to(message, INFO_MESSAGE, 
+                parse_mode="HTML",
+                reply_markup=create_reply_keyboard())
+
+def unknown_reply(message: telebot.types.Message) -> None:
+    bot.reply_to(message, "⚠️ Неизвестная команда. Используйте /help для списка команд",
+                reply_markup=create_reply_keyboard())
+
+# Кнопки клавиатуры и их обработчики
+BUTTON_HANDLERS: Dict[str, Callable[[telebot.types.Message], None]] = {
+    "▶️ Запустить": start_command,
+    "⏸️ Приостановить": stop_command,
+    "🛑 Остановить": stop_command,
+    "🔄 Перезапустить": restart_command,
+    "📊 Статистика": stats_reply,
+    "📝 Источники": sources_command,
+    "❓ Помощь": send_welcome,
+    "ℹ️ Инфо": info_reply,
+}
+KNOWN_BUTTONS = frozenset(BUTTON_HANDLERS)
+
 # Обработка текстовых сообщений (кнопок)
 @bot.message_handler(func=lambda message: True)
 def handle_text_messages(message: telebot.types.Message) -> None:
@@ -782,45 +1400,120 @@ def handle_text_messages(message: telebot.types.Message) -> None:
         return
     
     text = message.text.strip() # type: ignore
+    if text not in KNOWN_BUTTONS:
+        unknown_reply(message)
+        return
+    BUTTON_HANDLERS[text](message)
+
+# Проверка доступности ленты при запуске. Запрос одиночный, без повторов
+# общей сессии, чтобы недоступная лента не задерживала запуск дольше таймаута
+def check_feed(url: str) -> str:
+    try:
+        response = requests.get(url, timeout=FEED_CHECK_TIMEOUT)
+        response.raise_for_status()
+        return "OK" if parse_feed(response.content, dict(response.headers)) else "ERROR"
+    except requests.exceptions.Timeout:
+        return "TIMEOUT"
+    except Exception as e:
+        logger.warning(f"RSS check failed ({url}): {str(e)}")
+        return "ERROR"
+
+def check_feeds(urls: List[str]) -> List[str]:
+    """Проверяет ленты параллельно. Ленты, успешно проверенные за последние
+    FEED_CHECK_TTL секунд, не запрашиваются повторно"""
+    try:
+        with open(FEED_CHECK_STATE_PATH, 'r', encoding='utf-8') as f:
+            last_ok: Dict[str, float] = json.load(f)
+    except (OSError, ValueError):
+        last_ok = {}
+    # Повреждённый или чужой файл состояния считается пустым
+    if not isinstance(last_ok, dict):
+        last_ok = {}
+    last_ok = {url: ts for url, ts in last_ok.items() if isinstance(ts, (int, float))}
     
-    # Обработка кнопок
-    if text == "▶️ Запустить":
-        start_command(message)
-    elif text == "⏸️ Приостановить" or text == "🛑 Остановить":
-        stop_command(message)
-    elif text == "🔄 Перезапустить":
-        restart_command(message)
-    elif text == "📊 Статистика":
-        report = generate_combined_report()
-        bot.reply_to(message, report, 
-                    parse_mode="HTML",
-                    reply_markup=create_reply_keyboard())
-    elif text == "📝 Источники":
-        sources_command(message)
-    elif text == "❓ Помощь":
-        send_welcome(message)
-    elif text == "ℹ️ Инфо":
-        bot.reply_to(message, INFO_MESSAGE, 
-                    parse_mode="HTML",
-                    reply_markup=create_reply_keyboard())
-    else:
-        bot.reply_to(message, "⚠️ Неизвестная команда. Используйте /help для списка команд",
-                    reply_markup=create_reply_keyboard())
+    now = time.time()
+    stale = [url for url in urls if now - last_ok.get(url, 0) >= FEED_CHECK_TTL]
+    results: Dict[str, str] = {url: "CACHED" for url in urls}
+    if stale:
+        # map сохраняет порядок
+        with ThreadPoolExecutor(max_workers=max(1, min(FEED_WORKERS, len(stale)))) as executor:
+            for url, status in zip(stale, executor.map(check_feed, stale)):
+                results[url] = status
+                if status == "OK":
+                    last_ok[url] = now
+        try:
+            with open(FEED_CHECK_STATE_PATH, 'w', encoding='utf-8') as f:
+                json.dump(last_ok, f)
+        except OSError as e:
+            logger.warning(f"Failed to save RSS check state: {str(e)}")
+    return [results[url] for url in urls]
+
+# Данные канала, полученные при запуске; отчёты берут их без запросов к API
+channel_info: Optional[telebot.types.Chat] = None
 
 # Проверка доступа при запуске
 def initial_check() -> Optional[str]:
+    global channel_info
     try:
         me = bot.get_me()
         logger.info(f"Bot started: @{me.username}")
         
+        # Независимые проверки выполняются параллельно, результаты
+        # логируются по порядку после завершения всех задач
+        def _check_channel() -> telebot.types.Chat:
+            # get_chat проходит для любого публичного канала, поэтому право
+            # публикации проверяется по статусу бота среди участников.
+            # В канале публикуют только администраторы, в группе - любой участник
+            chat = bot.get_chat(CHANNEL_ID)
+            member = bot.get_chat_member(CHANNEL_ID, me.id)
+            if chat.type == 'channel':
+                can_post = member.status == 'creator' or (
+                    member.status == 'administrator' and member.can_post_messages is not False
+                )
+            else:
+                can_post = member.status in ('creator', 'administrator', 'member') or (
+                    member.status == 'restricted' and member.can_send_messages is not False
+                )
+            if not can_post:
+                raise RuntimeError(f"Bot cannot post to {chat.type} {CHANNEL_ID} (status: {member.status})")
+            return chat
+        
+        def _check_rss() -> List[str]:
+            return check_feeds(RSS_URLS)
+        
+        def _check_font_and_templates() -> Tuple[bool, List[str]]:
+            # Проверка наличия шрифта одним stat
+            try:
+                os.stat(MAIN_FONT_PATH)
+                font_found = True
+            except FileNotFoundError:
+                font_found = False
+            try:
+                with os.scandir(TEMPLATES_DIR) as it:
+                    templates = [e.name for e in it if e.is_file()]
+            except FileNotFoundError:
+                templates = []
+            return font_found, templates
+        
+        def _gen_test_image() -> Optional[io.BytesIO]:
+            # Тестовое изображение не попадает в кэш и не касается диска
+            return image_generator.generate_image(
+                "Тест генерации изображения: Запуск бота",
+                use_cache=False
+            )
+        
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix='startup') as executor:
+            channel_future = executor.submit(_check_channel)
+            rss_future = executor.submit(_check_rss)
+            files_future = executor.submit(_check_font_and_templates)
+            image_future = executor.submit(_gen_test_image)
+        
         # Проверка канала
-        bot.send_chat_action(CHANNEL_ID, 'typing')
-        logger.info(f"Channel access OK: {CHANNEL_ID}")
+        channel_info = channel_future.result()
+        logger.info(f"Channel access OK: {CHANNEL_ID} ({channel_info.title})")
         
         # Проверка RSS
-        for url in RSS_URLS:
-            feed = feedparser.parse(url)
-            status = "OK" if feed.entries else "ERROR"
+        for url, status in zip(RSS_URLS, rss_future.result()):
             logger.info(f"RSS check: {url} - {status}")
             
         # Проверка YandexGPT
@@ -830,52 +1523,45 @@ def initial_check() -> Optional[str]:
             logger.info("YandexGPT integration: DISABLED")
             
         # Проверка генератора изображений
+        font_found, templates = files_future.result()
         logger.info("Image generator setup:")
         logger.info(f"  Fonts directory: {FONTS_DIR}")
-        
-        # Проверка наличия шрифта
-        font_path = os.path.join(FONTS_DIR, DEFAULT_FONT)
-        if os.path.exists(font_path):
+        if font_found:
             logger.info(f"  Main font: {DEFAULT_FONT} - FOUND")
         else:
             logger.warning(f"  Main font: {DEFAULT_FONT} - NOT FOUND! Using system default")
-            
-        # Проверка шаблонов
         logger.info(f"  Templates directory: {TEMPLATES_DIR}")
-        templates = os.listdir(TEMPLATES_DIR) if os.path.exists(TEMPLATES_DIR) else []
         if templates:
             logger.info(f"  Found {len(templates)} templates")
         else:
             logger.warning("  No templates found! Using solid color backgrounds")
         
-        # Тестовая генерация изображения
-        test_image_path = image_generator.generate_image("Тест генерации изображения: Запуск бота")
-        if test_image_path and os.path.exists(test_image_path):
-            logger.info(f"Test image generated: {test_image_path}")
+        # Тестовое изображение отправляется только после завершения генерации
+        test_image = image_future.result()
+        if test_image:
+            logger.info(f"Test image generated: {test_image.getbuffer().nbytes} bytes")
             # Отправляем тестовое изображение владельцу
             try:
-                with open(test_image_path, 'rb') as photo:
-                    bot.send_photo(OWNER_ID, photo, caption="✅ Тест генерации изображений пройден успешно!")
-                os.remove(test_image_path)
+                bot.send_photo(OWNER_ID, test_image, caption="✅ Тест генерации изображений пройден успешно!")
             except Exception as e:
                 logger.warning(f"Failed to send test image: {str(e)}")
         else:
             logger.warning("Test image generation failed")
             
-        # Логирование конфигурации
-        logger.info(f"Configuration:")
-        logger.info(f"  TOKEN: {TOKEN[:5]}...{TOKEN[-5:]}")
-        logger.info(f"  CHANNEL_ID: {CHANNEL_ID}")
-        logger.info(f"  OWNER_ID: {OWNER_ID}")
-        logger.info(f"  RSS_URLS: {RSS_URLS}")
-        logger.info(f"  CHECK_INTERVAL: {CHECK_INTERVAL}")
-        logger.info(f"  YANDEX_API_KEY: {'Set' if YANDEX_API_KEY else 'Not set'}")
-        logger.info(f"  YANDEX_FOLDER_ID: {YANDEX_FOLDER_ID}")
-        logger.info(f"  DISABLE_YAGPT: {DISABLE_YAGPT}")
+        # Логирование конфигурации одной JSON-строкой, без токена
+        logger.info("startup_config %s", json.dumps({
+            "channel": CHANNEL_ID,
+            "owner": OWNER_ID,
+            "rss_urls": RSS_URLS,
+            "check_interval": CHECK_INTERVAL,
+            "yagpt": bool(YANDEX_API_KEY),
+            "yandex_folder_id": YANDEX_FOLDER_ID,
+            "disable_yagpt": DISABLE_YAGPT,
+        }, ensure_ascii=False, separators=(",", ":")))
             
     except Exception as e:
-        logger.critical(f"STARTUP ERROR: {str(e)}")
-        logger.error(traceback.format_exc())
+        # Трассировку форматирует logging, только если запись будет выведена
+        logger.critical("STARTUP ERROR: %s", e, exc_info=True)
         return f"⚠️ Ошибка при запуске: {str(e)}"
     return None
 
@@ -887,4 +1573,28 @@ if __name__ == '__main__':
         bot.send_message(OWNER_ID, error, parse_mode="HTML")
     
     logger.info("===== READY FOR COMMANDS =====")
-    bot.infinity_polling()
+    # SIGTERM обрабатывается как Ctrl+C: KeyboardInterrupt прерывает ожидание
+    # текущего long poll, и telebot сразу выходит из цикла опроса
+    def shutdown(signum: int, frame: Any) -> None:
+        logger.info(f"Received signal {signum}, stopping polling")
+        bot.stop_polling()
+        raise KeyboardInterrupt
+    
+    signal.signal(signal.SIGTERM, shutdown)
+    
+    try:
+        # Long polling: Telegram держит запрос до POLL_TIMEOUT секунд, пока нет
+        # обновлений. Накопившиеся за время простоя команды пропускаются.
+        # Бот обрабатывает только сообщения, остальные типы обновлений не запрашиваем
+        bot.infinity_polling(
+            long_polling_timeout=POLL_TIMEOUT,
+            skip_pending=True,
+            allowed_updates=['message']
+        )
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        logger.critical(f"Polling stopped with error: {str(e)}")
+    finally:
+        controller.stop()
+        logger.info("===== BOT STOPPED =====")